@@ -0,0 +1,110 @@
+"""
+data_io.py
+
+Shared CSV loading helpers for the pipeline scripts.
+
+Parsed CSVs are cached as Feather files next to the source file. A cache is
+reused while it is newer than its CSV, so reruns skip CSV tokenizing and type
+inference entirely. Without pyarrow the helpers fall back to plain read_csv.
+
+get_gdp() / get_pop() additionally memoize the raw input tables per process, so
+scripts orchestrated together (e.g. from a notebook) parse each file once.
+
+write_csv_async() overlaps independent output writes on a small thread pool;
+call wait_for_writes() before exiting to make sure they landed.
+
+VERBOSE gates printing whole DataFrames (head(), describe(), ...). It defaults to
+on for a terminal and off when output is redirected; set VERBOSE=1/0 (or
+true/false, yes/no) to force it.
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+# Feather caching and the multithreaded CSV reader both need pyarrow
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+CSV_ENGINE = "pyarrow" if HAVE_PYARROW else "c"
+# Arrow-backed strings keep country names in contiguous buffers for the .str kernels
+COUNTRY_DTYPE = "string[pyarrow]" if HAVE_PYARROW else "string"
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+GDP_CSV = PROJECT_ROOT / "gdp_per_capita_2021.csv"
+POP_CSV = PROJECT_ROOT / "population_2021.csv"
+
+# Read options for the raw inputs. These always use the C reader: pyarrow's has
+# no `thousands`, and "1,234" must parse the same with or without it (the
+# preview would otherwise coerce it to NaN). The Feather cache still skips the
+# reparse on later runs.
+RAW_READ_OPTIONS = {
+    "na_values": ["None", "-", "N/A"],
+    "thousands": ",",
+    "engine": "c",
+    "dtype": {"Country": COUNTRY_DTYPE},
+}
+
+# Building a DataFrame repr costs far more than the one-line progress messages.
+# An unset or empty VERBOSE falls back to the terminal check.
+_verbose_env = os.environ.get("VERBOSE", "").strip().lower()
+VERBOSE = _verbose_env in {"1", "true", "yes", "on"} if _verbose_env else sys.stdout.isatty()
+
+WRITE_POOL = ThreadPoolExecutor(max_workers=4)
+pending_writes = []
+
+
+def load_cached(csv_path, **read_csv_kwargs):
+    """Read csv_path with read_csv, reusing a sibling .feather cache when it is fresh.
+
+    The cache file name includes a hash of read_csv_kwargs, so callers reading
+    the same CSV with different options never share a cache entry. Pass
+    engine="c" for options the pyarrow reader lacks (e.g. thousands). A cache
+    that fails to load is treated as missing and rewritten.
+    """
+    csv_path = Path(csv_path)
+    if not HAVE_PYARROW:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+
+    options_hash = hashlib.md5(repr(sorted(read_csv_kwargs.items())).encode()).hexdigest()[:8]
+    cache_path = csv_path.with_name(f"{csv_path.stem}.{options_hash}.feather")
+    if cache_path.exists() and cache_path.stat().st_mtime > csv_path.stat().st_mtime:
+        try:
+            return pd.read_feather(cache_path)
+        except (OSError, ValueError):
+            # Unreadable cache (e.g. left truncated by an older run); rebuild it
+            pass
+
+    df = pd.read_csv(csv_path, **{"engine": CSV_ENGINE, **read_csv_kwargs})
+    # Write under a temporary name so an interrupted run never leaves a partial cache
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_feather(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return df
+
+
+@lru_cache(maxsize=None)
+def get_gdp():
+    """Raw GDP per capita table, parsed once per process. Copy before mutating."""
+    return load_cached(GDP_CSV, **RAW_READ_OPTIONS)
+
+
+@lru_cache(maxsize=None)
+def get_pop():
+    """Raw population table, parsed once per process. Copy before mutating."""
+    return load_cached(POP_CSV, **RAW_READ_OPTIONS)
+
+
+def write_csv_async(df, path, **to_csv_kwargs):
+    """Queue df.to_csv(path, ...) on WRITE_POOL. df must not be mutated afterwards."""
+    pending_writes.append(WRITE_POOL.submit(df.to_csv, path, **to_csv_kwargs))
+
+
+def wait_for_writes():
+    """Block until every queued write has finished, re-raising the first failure."""
+    while pending_writes:
+        pending_writes.pop(0).result()
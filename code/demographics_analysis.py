@@ -16,6 +16,8 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from data_io import COUNTRY_DTYPE, VERBOSE, load_cached
+
 # -----------------------------------------------------------------------------
 # Paths
 # -----------------------------------------------------------------------------
@@ -28,11 +30,11 @@ CLEANING_SUMMARY_FILE = CODE_DIR.parent / "output" / "cleaning_summary.txt"
 # -----------------------------------------------------------------------------
 # Load and convert
 # -----------------------------------------------------------------------------
-df = pd.read_csv(DATA_FILE)
+df = load_cached(DATA_FILE, dtype={'country': COUNTRY_DTYPE})
 df['country_original'] = df['country']
 
 # Clean country names with title case but preserve known special cases
-def smart_title(name: str) -> str:
+def smart_title(names: pd.Series) -> pd.Series:
     exceptions = {
         "Côte d'Ivoire": "Côte d'Ivoire",
         "DR Congo": "DR Congo",
@@ -45,12 +47,12 @@ def smart_title(name: str) -> str:
         "Antigua and Barbuda": "Antigua and Barbuda",
         "Trinidad and Tobago": "Trinidad and Tobago",
     }
-    cleaned = name.strip()
-    if cleaned.lower().startswith("the "):
-        cleaned = cleaned[4:]
-    return exceptions.get(cleaned, cleaned.title())
+    cleaned = names.str.strip()
+    has_article = cleaned.str.lower().str.startswith("the ")
+    cleaned = cleaned.mask(has_article, cleaned.str[4:])
+    return cleaned.map(exceptions).fillna(cleaned.str.title())
 
-df['country'] = df['country'].apply(smart_title)
+df['country'] = smart_title(df['country'])
 
 # Save name mismatches
 name_mismatches = df[df['country'] != df['country_original']][['country_original', 'country']]
@@ -76,9 +78,9 @@ df[numeric_fields] = df[numeric_fields].apply(pd.to_numeric, errors='coerce')
 # -----------------------------------------------------------------------------
 rows_before = df.shape[0]
 
-# Remove missing/invalid life expectancy values (both)
-df = df[df['life_expectancy_both'].between(40, 100)]
-df = df[df['life_expectancy_both'].notna()]
+# Remove missing/invalid life expectancy values (both); NaN fails the range check
+le = df['life_expectancy_both'].to_numpy()
+df = df.iloc[(le >= 40) & (le <= 100)]
 
 rows_after_valid_life_exp = df.shape[0]
 
@@ -92,8 +94,9 @@ print("=== DataFrame Info ===")
 print(f"Shape: {df.shape}")
 print(f"Columns: {list(df.columns)}\n")
 
-print("=== Summary Statistics ===")
-print(summary)
+if VERBOSE:
+    print("=== Summary Statistics ===")
+    print(summary)
 summary.to_csv(SUMMARY_STATS_FILE)
 
 # -----------------------------------------------------------------------------
@@ -109,15 +112,18 @@ else:
 # -----------------------------------------------------------------------------
 # Save cleaning summary
 # -----------------------------------------------------------------------------
+cleaning_summary = (
+    "Demographics Dataset Cleaning Summary\n"
+    "=====================================\n\n"
+    f"Original row count: {rows_before}\n"
+    f"Rows after removing invalid life expectancy: {rows_after_valid_life_exp}\n\n"
+    "Issues & Actions:\n"
+    "- Invalid life expectancy values (<40 or >100) → removed rows\n"
+    "- Missing life expectancy values → removed rows\n"
+    "- Country names normalized using smart_title() with manual exceptions\n"
+    "- Name mismatches logged in name_mismatches.csv\n"
+)
 with open(CLEANING_SUMMARY_FILE, 'w') as f:
-    f.write("Demographics Dataset Cleaning Summary\n")
-    f.write("=====================================\n\n")
-    f.write(f"Original row count: {rows_before}\n")
-    f.write(f"Rows after removing invalid life expectancy: {rows_after_valid_life_exp}\n\n")
-    f.write("Issues & Actions:\n")
-    f.write("- Invalid life expectancy values (<40 or >100) → removed rows\n")
-    f.write("- Missing life expectancy values → removed rows\n")
-    f.write("- Country names normalized using smart_title() with manual exceptions\n")
-    f.write("- Name mismatches logged in name_mismatches.csv\n")
+    f.write(cleaning_summary)
 
 print("\n✅ Cleaning summary written to cleaning_summary.txt")
@@ -4,6 +4,10 @@
 This script scrapes life expectancy, urban population, and population density data
 from each country listed on Worldometers' demographics section.
 
+Records are streamed to *output/demographics_data.partial.csv* while crawling, so a
+crash keeps the rows fetched so far. Fetched pages are cached under *output/.http_cache/* for ``CACHE_TTL`` seconds, so
+reruns only hit the network for new or expired pages.
+
 Outputs are written **one level above this script** in a sibling *output/* folder, i.e.:
 
     Needle‑ex‑1/output/
@@ -17,15 +21,23 @@ Run with:
 
 from __future__ import annotations
 
+import csv
+import hashlib
+import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from urllib.parse import urljoin
 
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from data_io import VERBOSE
 
 # -----------------------------------------------------------------------------
 # Paths & configuration
@@ -33,6 +45,8 @@ from bs4 import BeautifulSoup
 CODE_DIR: Path = Path(__file__).resolve().parent
 PROJECT_ROOT: Path = CODE_DIR.parent
 OUTPUT_DIR: Path = PROJECT_ROOT / "output"
+PARTIAL_FILE: Path = OUTPUT_DIR / "demographics_data.partial.csv"
+CACHE_DIR: Path = OUTPUT_DIR / ".http_cache"
 
 BASE_URL: str = "https://www.worldometers.info"
 START_URL: str = urljoin(BASE_URL, "/demographics/")
@@ -46,6 +60,16 @@ HEADERS: Dict[str, str] = {
 TIMEOUT: int = 30
 RETRY_SLEEP: float = 2.0
 MAX_RETRIES: int = 3
+MAX_WORKERS: int = 16
+REQUESTS_PER_SECOND: float = 2.0  # same ceiling as the old serial loop's 0.5 s sleep
+CACHE_TTL: float = 7 * 86400  # seconds before a cached page is re-fetched
+
+# Prefer the C-based lxml parser; fall back to the stdlib parser if it's missing
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER: str = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 # -----------------------------------------------------------------------------
 # Field keys to extract
@@ -59,6 +83,52 @@ NUMERIC_COLUMNS = [
     "population_density_km2",
 ]
 
+# -----------------------------------------------------------------------------
+# Precompiled patterns (used once per country page)
+# -----------------------------------------------------------------------------
+LABEL_CLASS_RE = re.compile("text-xl", re.I)
+URBAN_PERCENT_RE = re.compile(r"([\d.]+)%")
+URBAN_ABSOLUTE_RE = re.compile(r"\(([\d,]+)\s*people")
+URBAN_FALLBACK_RE = re.compile(r"Currently[^\n]*?([\d.]+)%[^\n]*?\(([\d,\s]+)\s*people", re.I)
+DENSITY_RE = re.compile(r"([\d,\.]+)\s*people per Km2", re.I)
+DENSITY_FALLBACK_RE = re.compile(r"population density[^\n]*?is\s*([\d.,]+)\s*people per km", re.I)
+SEPARATORS_RE = re.compile(r"[\s,]")
+NON_NUMERIC_RE = re.compile(r"[^\d.]")
+
+
+# -----------------------------------------------------------------------------
+# HTTP session & rate limiting
+# -----------------------------------------------------------------------------
+
+class RateLimiter:
+    """Token bucket shared by all worker threads to keep the crawl polite."""
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+RATE_LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+
 
 # -----------------------------------------------------------------------------
 # Utilities
@@ -73,7 +143,8 @@ def request_with_retry(url: str) -> requests.Response:
     """Request URL with retry logic for transient failures."""
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+            RATE_LIMITER.acquire()
+            resp = SESSION.get(url, timeout=TIMEOUT)
             resp.raise_for_status()
             if "checking your browser" in resp.text.lower():
                 raise RuntimeError("Cloudflare challenge – retrying")
@@ -81,14 +152,32 @@ def request_with_retry(url: str) -> requests.Response:
         except (requests.HTTPError, RuntimeError) as exc:
             if attempt == MAX_RETRIES:
                 raise
-            print(f"Retry {attempt}/{MAX_RETRIES} for {url}: {exc}")
+            # Called from worker threads: one write per line so lines don't interleave
+            print(f"Retry {attempt}/{MAX_RETRIES} for {url}: {exc}\n", end="")
             time.sleep(RETRY_SLEEP)
     raise RuntimeError("Exceeded max retries")
 
 
+def fetch_text(url: str) -> str:
+    """Return page text from the on-disk cache, fetching it on a miss."""
+    cache_file = CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()}.html"
+    try:
+        if time.time() - cache_file.stat().st_mtime < CACHE_TTL:
+            return cache_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        pass
+
+    text = request_with_retry(url).text
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp_file.write_text(text, encoding="utf-8")
+    os.replace(tmp_file, cache_file)
+    return text
+
+
 def fetch_html(url: str) -> BeautifulSoup:
-    """Fetch HTML and parse with BeautifulSoup."""
-    return BeautifulSoup(request_with_retry(url).text, "html.parser")
+    """Fetch HTML (cached) and parse with BeautifulSoup."""
+    return BeautifulSoup(fetch_text(url), HTML_PARSER)
 
 
 # -----------------------------------------------------------------------------
@@ -159,10 +248,11 @@ def extract_country_data(name: str, url: str) -> Dict[str, Any]:
     """Extract demographic data from a country page."""
     soup = fetch_html(url)
     record: Dict[str, Any] = {"country": name}
+    page_text: Optional[str] = None  # full-page text, built once if a fallback needs it
 
     # ── Life Expectancy blocks ───────────────────────────────────────────────
     for block in soup.find_all("div", class_="p-4"):
-        label_el = block.find_previous("div", class_=re.compile("text-xl", re.I))
+        label_el = block.find_previous("div", class_=LABEL_CLASS_RE)
         value_el = block.find("div", class_="text-2xl")
         if not label_el or not value_el:
             continue
@@ -187,23 +277,19 @@ def extract_country_data(name: str, url: str) -> Dict[str, Any]:
         if urban_para:
             urban_text = urban_para.get_text(strip=True)
 
-            percent_match = re.search(r"([\d.]+)%", urban_text)
+            percent_match = URBAN_PERCENT_RE.search(urban_text)
             if percent_match:
                 record["urban_population_percent"] = percent_match.group(1)
 
-            absolute_match = re.search(r"\(([\d,]+)\s*people", urban_text)
+            absolute_match = URBAN_ABSOLUTE_RE.search(urban_text)
             if absolute_match:
                 record["urban_population_absolute"] = absolute_match.group(1).replace(",", "")
     else:
         page_text = soup.get_text("\n")
-        m_urban = re.search(
-            r"Currently[^\n]*?([\d.]+)%[^\n]*?\(([\d,\s]+)\s*people",
-            page_text,
-            flags=re.IGNORECASE,
-        )
+        m_urban = URBAN_FALLBACK_RE.search(page_text)
         if m_urban:
             record["urban_population_percent"] = m_urban.group(1)
-            record["urban_population_absolute"] = re.sub(r"[\s,]", "", m_urban.group(2))
+            record["urban_population_absolute"] = SEPARATORS_RE.sub("", m_urban.group(2))
 
     # --- Population Density -------------------------------------------------
     density_heading = soup.find(
@@ -215,18 +301,15 @@ def extract_country_data(name: str, url: str) -> Dict[str, Any]:
         density_para = density_heading.find_next("p")
         if density_para:
             density_text = density_para.get_text(strip=True)
-            density_match = re.search(r"([\d,\.]+)\s*people per Km2", density_text, flags=re.IGNORECASE)
+            density_match = DENSITY_RE.search(density_text)
             if density_match:
                 record["population_density_km2"] = density_match.group(1).replace(",", "")
     else:
-        page_text = soup.get_text("\n")
-        m_density = re.search(
-            r"population density[^\n]*?is\s*([\d.,]+)\s*people per km",
-            page_text,
-            flags=re.IGNORECASE,
-        )
+        if page_text is None:
+            page_text = soup.get_text("\n")
+        m_density = DENSITY_FALLBACK_RE.search(page_text)
         if m_density:
-            record["population_density_km2"] = re.sub(r"[^\d.]", "", m_density.group(1))
+            record["population_density_km2"] = NON_NUMERIC_RE.sub("", m_density.group(1))
 
     # Fill missing keys just in case
     for key in NUMERIC_COLUMNS:
@@ -242,27 +325,38 @@ def extract_country_data(name: str, url: str) -> Dict[str, Any]:
 def convert_numeric_fields(df: pd.DataFrame) -> pd.DataFrame:
     """Convert string fields to appropriate numeric types."""
     for col in NUMERIC_COLUMNS:
-        if col in df.columns:
-            df[col] = (
-                df[col].astype(str)
-                .str.replace(",", "", regex=False)
-                .str.replace(" ", "", regex=False)
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(
+                df[col].astype(str).str.replace(SEPARATORS_RE, "", regex=True),
+                errors="coerce",
             )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
     return df
 
 
 def save_head(df: pd.DataFrame, fname: str, label: str) -> None:
-    """Save the first 10 rows to CSV and print to console."""
-    df.head(10).to_csv(OUTPUT_DIR / fname, index=False)
-    print(f"\n=== FIRST 10 ROWS ({label}) ===")
-    print(df.head(10))
+    """Save the first 10 rows to CSV and, when VERBOSE, print them to console."""
+    head = df.head(10)
+    head.to_csv(OUTPUT_DIR / fname, index=False)
+    if VERBOSE:
+        print(f"\n=== FIRST 10 ROWS ({label}) ===")
+        print(head)
 
 
 # -----------------------------------------------------------------------------
 # Main function - crawl all countries
 # -----------------------------------------------------------------------------
 
+def crawl_country(country_name: str, country_url: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """Extract one country's data, returning (record, None) or (None, error) instead of raising.
+
+    Runs in worker threads, so it never prints; main() logs progress in order.
+    """
+    try:
+        return extract_country_data(country_name, country_url), None
+    except Exception as e:
+        return None, e
+
+
 def main() -> None:
     """Main function to crawl all countries and extract data."""
     ensure_output_dir()
@@ -276,26 +370,30 @@ def main() -> None:
     if not countries:
         raise RuntimeError("No country links found. Website structure may have changed.")
 
-    records: List[Dict[str, Any]] = []
-
-    for i, (country_name, country_url) in enumerate(countries, 1):
-        try:
-            print(f"[{i}/{len(countries)}] Processing {country_name}...", end=" ")
-            country_data = extract_country_data(country_name, country_url)
-            records.append(country_data)
-            print("✓")
-            # Be nice to the server
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"✗ Error: {e}")
-
-    # Create DataFrame and convert numeric fields
-    df_demographics = pd.DataFrame(records)
-    df_demographics = convert_numeric_fields(df_demographics)
-    # After converting numeric fields
+    total = len(countries)
+
+    # Fetch pages concurrently; RATE_LIMITER keeps us nice to the server.
+    # Each record is appended to PARTIAL_FILE as it arrives, so rows already
+    # crawled survive a crash and memory stays flat.
+    with open(PARTIAL_FILE, "w", newline="", encoding="utf-8") as fh, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        writer = csv.DictWriter(fh, fieldnames=["country", *NUMERIC_COLUMNS])
+        writer.writeheader()
+        results = executor.map(lambda country: crawl_country(*country), countries)
+        for i, ((country_name, _), (country_data, error)) in enumerate(zip(countries, results), 1):
+            if error is not None:
+                print(f"[{i}/{total}] Processing {country_name}... ✗ Error: {error}")
+                continue
+            print(f"[{i}/{total}] Processing {country_name}... ✓")
+            writer.writerow(country_data)
+            fh.flush()
+
+    # Load streamed records and convert numeric fields
+    df_demographics = pd.read_csv(PARTIAL_FILE, dtype={"country": str})
     df_demographics = convert_numeric_fields(df_demographics)
     # Save full dataset
     df_demographics.to_csv(OUTPUT_DIR / "demographics_data.csv", index=False)
+    PARTIAL_FILE.unlink()
 
     # Save and display first 10 rows (before sorting)
     save_head(df_demographics, "demographics_before_sort.csv", "Before Sort")
@@ -12,10 +12,15 @@ Run with:
     python feature_engineering.py
 """
 
+import difflib
+import re
+import unicodedata
 import pandas as pd
 from pathlib import Path
 import numpy as np
 
+from data_io import COUNTRY_DTYPE, VERBOSE, load_cached
+
 # -----------------------------------------------------------------------------
 # Paths
 # -----------------------------------------------------------------------------
@@ -29,17 +34,31 @@ OUT_CRAWLED_SAMPLE = DATA_DIR / "crawled_sample.csv"
 OUT_DEMO_STATS = DATA_DIR / "demographics_descriptive_stats.csv"
 OUT_VERIFICATION = DATA_DIR / "verification_check.csv"
 
+# Count columns (population, density) are left to the reader so they stay int64
+DEMO_DTYPES = {
+    "country": COUNTRY_DTYPE,
+    "life_expectancy_both": "float64",
+    "life_expectancy_female": "float64",
+    "life_expectancy_male": "float64",
+    "urban_population_percent": "float64",
+}
+GDP_DTYPES = {"Country": COUNTRY_DTYPE, "GDP_per_capita_PPP": "float64"}
+POP_DTYPES = {"Country": COUNTRY_DTYPE}
+
+# Minimum similarity for suggesting a demographics name for an unmatched country
+FUZZY_CUTOFF = 0.8
+
 # -----------------------------------------------------------------------------
 # Load Data
 # -----------------------------------------------------------------------------
-df_demo = pd.read_csv(DATA_DIR / "demographics_data.csv")
-df_gdp = pd.read_csv(DATA_DIR / "cleaned_gdp.csv")
-df_pop = pd.read_csv(DATA_DIR / "cleaned_pop.csv")
+df_demo = load_cached(DATA_DIR / "demographics_data.csv", dtype=DEMO_DTYPES)
+df_gdp = load_cached(DATA_DIR / "cleaned_gdp.csv", dtype=GDP_DTYPES)
+df_pop = load_cached(DATA_DIR / "cleaned_pop.csv", dtype=POP_DTYPES)
 
 # Standardize column names and index
-df_demo.columns = [col.strip() for col in df_demo.columns]
-df_gdp.columns = [col.strip() for col in df_gdp.columns]
-df_pop.columns = [col.strip() for col in df_pop.columns]
+df_demo.columns = df_demo.columns.str.strip()
+df_gdp.columns = df_gdp.columns.str.strip()
+df_pop.columns = df_pop.columns.str.strip()
 
 df_gdp.rename(columns={df_gdp.columns[-1]: "GDPperCapitaPPP"}, inplace=True)
 df_pop.rename(columns={df_pop.columns[-1]: "Population"}, inplace=True)
@@ -48,41 +67,85 @@ for df in [df_demo, df_gdp, df_pop]:
     df.set_index("Country" if "Country" in df.columns else "country", inplace=True)
     df.index = df.index.str.strip()
 
+# -----------------------------------------------------------------------------
+# Country name alignment
+# -----------------------------------------------------------------------------
+def country_key(name):
+    """Loose comparison key: ASCII-folded, lowercase, "&" -> "and", alphanumerics only."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", ascii_name.lower().replace("&", "and"))
+
+
+def align_country_names(index, canonical):
+    """Rename index entries that match a canonical name by country_key().
+
+    Names with no key match are never renamed automatically (e.g. "South America"
+    is close to "South Africa"); the closest candidate is printed instead so the
+    cleaner's country_name_map can be extended.
+    """
+    by_key = {country_key(c): c for c in canonical}
+    taken = set(index.intersection(canonical))
+    renames = {}
+    for name in index.difference(canonical):
+        key = country_key(name)
+        match = by_key.get(key)
+        if match is not None and match not in taken:
+            renames[name] = match
+            taken.add(match)
+        elif match is None:
+            close = difflib.get_close_matches(key, by_key, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                print(f"No match for '{name}' (closest: '{by_key[close[0]]}')")
+    return index.map(lambda name: renames.get(name, name))
+
+
+df_gdp.index = align_country_names(df_gdp.index, df_demo.index)
+df_pop.index = align_country_names(df_pop.index, df_demo.index)
+
 # -----------------------------------------------------------------------------
 # 5.4 Data Integration (inner join)
 # -----------------------------------------------------------------------------
-countries_before = set(df_demo.index) | set(df_gdp.index) | set(df_pop.index)
+countries_before = df_demo.index.union(df_gdp.index).union(df_pop.index)
+
+# Share one categorical dtype so the joins match on integer codes, not strings
+country_dtype = pd.CategoricalDtype(countries_before)
+for df in [df_demo, df_gdp, df_pop]:
+    df.index = df.index.astype(country_dtype)
+
 df_merged = df_demo.join(df_gdp, how="inner").join(df_pop, how="inner")
-countries_after = set(df_merged.index)
 
 # Save lost countries
-df_lost = sorted(countries_before - countries_after)
+df_lost = countries_before.difference(df_merged.index).sort_values()
 pd.Series(df_lost, name="LostCountry").to_csv(LOST_COUNTRIES_PATH, index=False)
 
 # -----------------------------------------------------------------------------
 # Handle Missing Values
 # -----------------------------------------------------------------------------
 print("\n=== Missing Values Report ===")
-missing_report = df_merged.isnull().sum()
+null_mask = df_merged.isnull()
+missing_report = null_mask.sum()
 missing_report = missing_report[missing_report > 0]
 print(missing_report)
 
 # Print the actual countries with missing values
 for col in missing_report.index:
-    missing_countries = df_merged[df_merged[col].isnull()].index.tolist()
+    missing_countries = df_merged.index[null_mask[col]].tolist()
     print(f"\nCountries missing '{col}' ({len(missing_countries)}):")
     for c in missing_countries:
         print(f" - {c}")
 
 
-# Fill missing values in numeric columns
-for col in df_merged.select_dtypes(include=["number"]).columns:
-    if df_merged[col].isnull().any():
-        df_merged[col].fillna(df_merged[col].mean(), inplace=True)
+numeric_cols = df_merged.select_dtypes(include=["number"]).columns
+non_numeric_cols = df_merged.columns.drop(numeric_cols)
+
+# Fill missing values in numeric columns with the column mean
+if null_mask[numeric_cols].any(axis=None):
+    numeric = df_merged[numeric_cols]
+    df_merged[numeric_cols] = numeric.fillna(numeric.mean())
 
 # Drop rows with missing values in categorical columns
-non_numeric_cols = df_merged.select_dtypes(exclude=["number"]).columns
-df_merged.dropna(subset=non_numeric_cols, inplace=True)
+if null_mask[non_numeric_cols].any(axis=None):
+    df_merged.dropna(subset=non_numeric_cols, inplace=True)
 
 # -----------------------------------------------------------------------------
 # 5.1 New Feature: Total GDP
@@ -94,18 +157,17 @@ df_merged["TotalGDP"] = df_merged["GDPperCapitaPPP"] * df_merged["Population"]
 # -----------------------------------------------------------------------------
 # 5.2 Log Transforms
 # -----------------------------------------------------------------------------
-df_merged["LogGDPperCapita"] = np.log10(df_merged["GDPperCapitaPPP"].abs())
-df_merged["LogPopulation"] = np.log10(df_merged["Population"].abs())
+# Both columns are strictly positive after the filter above
+values = df_merged[["GDPperCapitaPPP", "Population"]].to_numpy(dtype=np.float64)
+df_merged[["LogGDPperCapita", "LogPopulation"]] = np.log10(values)
 
 # -----------------------------------------------------------------------------
 # 5.3 Scaling (Z-score Normalization)
 # -----------------------------------------------------------------------------
-def zscore(series):
-    return (series - series.mean()) / series.std()
-
-df_merged["life_expectancy_both_scaled"] = zscore(df_merged["life_expectancy_both"])
-df_merged["LogGDPperCapita_scaled"] = zscore(df_merged["LogGDPperCapita"])
-df_merged["LogPopulation_scaled"] = zscore(df_merged["LogPopulation"])
+features = ["life_expectancy_both", "LogGDPperCapita", "LogPopulation"]
+arr = df_merged[features].to_numpy(dtype=np.float64)
+scaled = (arr - arr.mean(axis=0)) / arr.std(axis=0, ddof=1)
+df_merged[[f"{col}_scaled" for col in features]] = scaled
 
 # -----------------------------------------------------------------------------
 # Save Results
@@ -118,11 +180,13 @@ X = df_merged[[
     "LogPopulation_scaled"
 ]].sort_index()
 
-print("\n=== Preview of final X feature matrix ===")
-print(X.head())
+if VERBOSE:
+    print("\n=== Preview of final X feature matrix ===")
+    print(X.head())
 print(f"Shape: {X.shape}\n")
 
-np.save(X_PATH, X.to_numpy())
+# Row-major so consumers can np.load(X_PATH, mmap_mode="r") and page rows in lazily
+np.save(X_PATH, np.ascontiguousarray(X.to_numpy(dtype=np.float64, copy=False)))
 
 print(f"Final merged data saved to: {OUTFILE.relative_to(PROJECT_ROOT)}")
 print(f"Lost countries saved to: {LOST_COUNTRIES_PATH.relative_to(PROJECT_ROOT)}")
@@ -7,9 +7,9 @@ Main tasks:
 - Loads GDP per Capita and Population datasets (CSV files).
 - Cleans numerical values: removes commas, non-numeric characters, and converts to numeric type.
 - Drops rows with missing GDP or Population values.
-- Detects and counts outliers using the Tukey method (Population uses log10 scale for skew adjustment).
-- Removes duplicate country entries (keeping the first occurrence).
-- Harmonizes country names using explicit mapping dictionaries to align with demographics dataset conventions.
+- Removes duplicate country entries (keeping the first row with a valid value).
+- Detects and counts outliers using the Tukey method (Population uses log2 scale for skew adjustment).
+- Harmonizes country names using an explicit mapping dictionary to align with demographics dataset conventions.
 - Saves cleaned datasets to the output folder as CSV files:
     - output/cleaned_gdp.csv
     - output/cleaned_pop.csv
@@ -21,56 +21,24 @@ To run:
     python gdp_population_cleaning.py
 """
 
+import re
 import pandas as pd
 import numpy as np
 import os
 
+from data_io import get_gdp, get_pop, wait_for_writes, write_csv_async
+
 # Setup
 output_dir = "../output"
 os.makedirs(output_dir, exist_ok=True)
 
-# === GDP CLEANING ===
-
-# Load GDP file
-df_gdp = pd.read_csv("/Users/ShaniStu/PycharmProjects/Needle-ex-1/output/gdp_per_capita_2021.csv", na_values=["None"])
-df_gdp.columns = [col.replace(" ", "_") for col in df_gdp.columns]
-
-# Clean GDP values
-df_gdp['GDP_per_capita_PPP'] = (
-    df_gdp['GDP_per_capita_PPP']
-    .astype(str)
-    .str.replace(",", "")
-    .str.replace(r"[^\d.]", "", regex=True)
-)
-df_gdp['GDP_per_capita_PPP'] = pd.to_numeric(df_gdp['GDP_per_capita_PPP'], errors='coerce')
-
-# Drop missing
-missing_mask = df_gdp['GDP_per_capita_PPP'].isna()
-df_dropped = df_gdp[missing_mask]
-df_dropped.to_csv(f"{output_dir}/dropped_gdp.csv", index=False)
-df_gdp = df_gdp[~missing_mask]
-print(f"\nDropped rows due to missing GDP: {len(df_dropped)}")
-
-# Outlier detection (Tukey)
-q1 = df_gdp['GDP_per_capita_PPP'].quantile(0.25)
-q3 = df_gdp['GDP_per_capita_PPP'].quantile(0.75)
-iqr = q3 - q1
-lower_bound = q1 - 1.5 * iqr
-upper_bound = q3 + 1.5 * iqr
-outliers = df_gdp[(df_gdp['GDP_per_capita_PPP'] < lower_bound) | (df_gdp['GDP_per_capita_PPP'] > upper_bound)]
-print(f"Outliers in GDP data (Tukey method): {len(outliers)}")
-
-# Remove duplicates
-duplicates = df_gdp[df_gdp.duplicated(subset='Country', keep=False)]
-if not duplicates.empty:
-    print(f"\nFound duplicate countries:\n{duplicates['Country'].value_counts()}")
-    df_gdp = df_gdp.drop_duplicates(subset='Country', keep='first')
-    print("Duplicates dropped, keeping the first occurrence.")
-else:
-    print("No duplicate country entries found.")
+# Anything that isn't a digit or decimal point (commas, footnote marks, ...)
+non_numeric_re = re.compile(r"[^\d.]")
 
-# Country name mapping
-gdp_country_name_map = {
+# GDP/population spellings mapped to the demographics dataset's. Names missing
+# here that differ only by accents, case or "&" vs "and" are still reconciled
+# in feature_engeneering.py, but listing them keeps the cleaned CSVs aligned.
+country_name_map = {
     "Cape Verde": "Cabo Verde",
     "Czechia": "Czech Republic (Czechia)",
     "Cote d'Ivoire": "Côte d'Ivoire",
@@ -80,48 +48,80 @@ gdp_country_name_map = {
     "Reunion": "Réunion",
     "Sao Tome and Principe": "Sao Tome & Principe",
     "St. Vincent and the Grenadines": "St. Vincent & Grenadines",
+    "Saint Vincent and the Grenadines": "St. Vincent & Grenadines",
     "Palestine": "State of Palestine",
     "United States Virgin Islands": "U.S. Virgin Islands",
     "East Timor": "Timor-Leste"
 }
 
-df_gdp['Country'] = df_gdp['Country'].replace(gdp_country_name_map)
+
+def tukey_outlier_mask(values):
+    """Boolean mask of values outside Tukey's fences (1.5 * IQR beyond Q1/Q3)."""
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+
+
+# === GDP CLEANING ===
+
+# Load GDP file
+df_gdp = get_gdp().copy()
+df_gdp.columns = df_gdp.columns.str.replace(" ", "_", regex=False)
+
+# Clean GDP values (only needed if stray non-numeric text kept the column as strings)
+if not pd.api.types.is_numeric_dtype(df_gdp['GDP_per_capita_PPP']):
+    df_gdp['GDP_per_capita_PPP'] = pd.to_numeric(
+        df_gdp['GDP_per_capita_PPP'].astype(str).str.replace(non_numeric_re, "", regex=True),
+        errors='coerce'
+    )
+
+# Drop missing (one ndarray mask, used for both halves of the split)
+missing_mask = df_gdp['GDP_per_capita_PPP'].isna().to_numpy()
+write_csv_async(df_gdp.iloc[missing_mask], f"{output_dir}/dropped_gdp.csv", index=False)
+df_gdp = df_gdp.iloc[~missing_mask]
+print(f"\nDropped rows due to missing GDP: {missing_mask.sum()}")
+
+# Remove duplicates after the missing-value drop, so a country whose first row
+# is missing keeps its later valid row; still ahead of the Tukey scan
+duplicates = df_gdp[df_gdp.duplicated(subset='Country', keep=False)]
+if not duplicates.empty:
+    print(f"\nFound duplicate countries:\n{duplicates['Country'].value_counts()}")
+    df_gdp = df_gdp.drop_duplicates(subset='Country', keep='first')
+    print("Duplicates dropped, keeping the first occurrence.")
+else:
+    print("No duplicate country entries found.")
+
+# Outlier detection (Tukey)
+outliers = df_gdp[tukey_outlier_mask(df_gdp['GDP_per_capita_PPP'].to_numpy())]
+print(f"Outliers in GDP data (Tukey method): {len(outliers)}")
+
+# Country name mapping
+df_gdp['Country'] = df_gdp['Country'].map(country_name_map).fillna(df_gdp['Country'])
 df_gdp.set_index('Country', inplace=True)
-df_gdp.to_csv(f"{output_dir}/cleaned_gdp.csv")
+write_csv_async(df_gdp, f"{output_dir}/cleaned_gdp.csv")
 print("GDP cleaning complete. Cleaned data saved to output/cleaned_gdp.csv.")
 
 # === POPULATION CLEANING ===
 
 # Load population file
-df_pop = pd.read_csv("/Users/ShaniStu/PycharmProjects/Needle-ex-1/output/population_2021.csv", na_values=["None"])
-df_pop.columns = [col.replace(" ", "_") for col in df_pop.columns]
-
-# Clean population values
-df_pop['Population'] = (
-    df_pop['Population']
-    .astype(str)
-    .str.replace(",", "")
-    .str.replace(r"[^\d.]", "", regex=True)
-)
-df_pop['Population'] = pd.to_numeric(df_pop['Population'], errors='coerce')
-
-# Drop missing
-missing_pop = df_pop[df_pop['Population'].isna()]
-missing_pop.to_csv(f"{output_dir}/dropped_pop.csv", index=False)
-print(f"\nDropped Population rows: {len(missing_pop)}")
-df_pop = df_pop.dropna(subset=['Population'])
-
-# Detect outliers (log10 + Tukey)
-df_pop['log10_Pop'] = np.log10(df_pop['Population'])
-q1_log = df_pop['log10_Pop'].quantile(0.25)
-q3_log = df_pop['log10_Pop'].quantile(0.75)
-iqr_log = q3_log - q1_log
-lower_log = q1_log - 1.5 * iqr_log
-upper_log = q3_log + 1.5 * iqr_log
-pop_outliers = df_pop[(df_pop['log10_Pop'] < lower_log) | (df_pop['log10_Pop'] > upper_log)]
-print(f"Population outliers detected (Tukey on log10): {len(pop_outliers)}")
-
-# Remove duplicates
+df_pop = get_pop().copy()
+df_pop.columns = df_pop.columns.str.replace(" ", "_", regex=False)
+
+# Clean population values (only needed if stray non-numeric text kept the column as strings)
+if not pd.api.types.is_numeric_dtype(df_pop['Population']):
+    df_pop['Population'] = pd.to_numeric(
+        df_pop['Population'].astype(str).str.replace(non_numeric_re, "", regex=True),
+        errors='coerce'
+    )
+
+# Drop missing (one ndarray mask, used for both halves of the split)
+missing_mask = df_pop['Population'].isna().to_numpy()
+write_csv_async(df_pop.iloc[missing_mask], f"{output_dir}/dropped_pop.csv", index=False)
+print(f"\nDropped Population rows: {missing_mask.sum()}")
+df_pop = df_pop.iloc[~missing_mask]
+
+# Remove duplicates after the missing-value drop, so a country whose first row
+# is missing keeps its later valid row; still ahead of the Tukey scan
 duplicates = df_pop[df_pop.duplicated(subset='Country', keep=False)]
 if not duplicates.empty:
     print(f"\nFound duplicate countries:\n{duplicates['Country'].value_counts()}")
@@ -130,24 +130,14 @@ if not duplicates.empty:
 else:
     print("No duplicate country entries found.")
 
-# Country name mapping
-pop_country_name_map = {
-    "Cape Verde": "Cabo Verde",
-    "Czechia": "Czech Republic (Czechia)",
-    "Cote d'Ivoire": "Côte d'Ivoire",
-    "Curacao": "Curaçao",
-    "Democratic Republic of Congo": "DR Congo",
-    "Micronesia (country)": "Micronesia",
-    "Reunion": "Réunion",
-    "Sao Tome and Principe": "Sao Tome & Principe",
-    "Saint Vincent and the Grenadines": "St. Vincent & Grenadines",
-    "Palestine": "State of Palestine",
-    "United States Virgin Islands": "U.S. Virgin Islands",
-    "East Timor": "Timor-Leste"
-}
+# Detect outliers (log2 + Tukey); the fences scale with the log, so any base flags the same rows
+pop_outliers = df_pop[tukey_outlier_mask(np.log2(df_pop['Population'].to_numpy()))]
+print(f"Population outliers detected (Tukey on log2): {len(pop_outliers)}")
 
-df_pop['Country'] = df_pop['Country'].replace(pop_country_name_map)
+# Country name mapping
+df_pop['Country'] = df_pop['Country'].map(country_name_map).fillna(df_pop['Country'])
 df_pop.set_index('Country', inplace=True)
-df_pop.drop(columns=['log10_Pop'], inplace=True)
-df_pop.to_csv(f"{output_dir}/cleaned_pop.csv")
+write_csv_async(df_pop, f"{output_dir}/cleaned_pop.csv")
 print("Population cleaning complete. Cleaned data saved to output/cleaned_pop.csv.")
+
+wait_for_writes()
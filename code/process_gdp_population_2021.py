@@ -21,66 +21,90 @@ Output files are saved to:
     - output/pop_describe.csv
 
 To run:
-    python gdp_population_preview.py
+    python process_gdp_population_2021.py
+
+Or call preview(df_gdp, df_pop, output_dir) from another script.
 """
 
 import pandas as pd
 import os
 
-# Step a) Load CSV files from parent directory
-df_gdp = pd.read_csv("../gdp_per_capita_2021.csv", na_values=["None"])
-df_pop = pd.read_csv("../population_2021.csv", na_values=["None"])
-
-# Step b) Rename columns to use underscores instead of spaces
-df_gdp.columns = [col.replace(" ", "_") for col in df_gdp.columns]
-df_pop.columns = [col.replace(" ", "_") for col in df_pop.columns]
-
-# Confirm shapes and columns
-print("\n--- DataFrame Shapes and Columns ---")
-print(f"GDP shape: {df_gdp.shape}")
-print(f"GDP columns: {list(df_gdp.columns)}\n")
-
-print(f"Population shape: {df_pop.shape}")
-print(f"Population columns: {list(df_pop.columns)}\n")
-
-# Confirm required columns exist after renaming
-assert 'Country' in df_gdp.columns and 'GDP_per_capita_PPP' in df_gdp.columns, "Missing columns in df_gdp"
-assert 'Country' in df_pop.columns and 'Population' in df_pop.columns, "Missing columns in df_pop"
-
-# Step c) Convert GDP and Population columns to numeric
-df_gdp['GDP_per_capita_PPP'] = pd.to_numeric(df_gdp['GDP_per_capita_PPP'], errors='coerce')
-df_pop['Population'] = pd.to_numeric(df_pop['Population'], errors='coerce')
-
-# Save output to parent directory's "output" folder
-output_dir = "../output"
-os.makedirs(output_dir, exist_ok=True)
-
-# Step d) Save and print before sort
-print("\n--- GDP Data (Before Sort) ---")
-print(df_gdp.head())
-df_gdp.head().to_csv(f"{output_dir}/gdp_before_sort.csv", index=False)
-
-print("\n--- Population Data (Before Sort) ---")
-print(df_pop.head())
-df_pop.head().to_csv(f"{output_dir}/pop_before_sort.csv", index=False)
-
-# Sort and save after sort
-df_gdp_sorted = df_gdp.sort_values(by="Country")
-df_pop_sorted = df_pop.sort_values(by="Country")
-
-print("\n--- GDP Data (After Sort) ---")
-print(df_gdp_sorted.head())
-df_gdp_sorted.head().to_csv(f"{output_dir}/gdp_after_sort.csv", index=False)
-
-print("\n--- Population Data (After Sort) ---")
-print(df_pop_sorted.head())
-df_pop_sorted.head().to_csv(f"{output_dir}/pop_after_sort.csv", index=False)
-
-# Step e) Describe and print
-print("\n--- GDP Describe ---")
-print(df_gdp.describe())
-df_gdp.describe().to_csv(f"{output_dir}/gdp_describe.csv")
-
-print("\n--- Population Describe ---")
-print(df_pop.describe())
-df_pop.describe().to_csv(f"{output_dir}/pop_describe.csv")
+from data_io import VERBOSE, get_gdp, get_pop, wait_for_writes, write_csv_async
+
+
+def preview(df_gdp, df_pop, output_dir="../output"):
+    """Save the preview reports for raw GDP and population frames (printed when VERBOSE).
+
+    The frames are modified in place (column renames, numeric conversion),
+    so pass copies when the originals are shared.
+    """
+    # Step b) Rename columns to use underscores instead of spaces
+    df_gdp.columns = df_gdp.columns.str.replace(" ", "_", regex=False)
+    df_pop.columns = df_pop.columns.str.replace(" ", "_", regex=False)
+
+    # Confirm shapes and columns
+    print("\n--- DataFrame Shapes and Columns ---")
+    print(f"GDP shape: {df_gdp.shape}")
+    print(f"GDP columns: {list(df_gdp.columns)}\n")
+
+    print(f"Population shape: {df_pop.shape}")
+    print(f"Population columns: {list(df_pop.columns)}\n")
+
+    # Confirm required columns exist after renaming
+    assert 'Country' in df_gdp.columns and 'GDP_per_capita_PPP' in df_gdp.columns, "Missing columns in df_gdp"
+    assert 'Country' in df_pop.columns and 'Population' in df_pop.columns, "Missing columns in df_pop"
+
+    # Step c) Convert GDP and Population columns to numeric
+    df_gdp['GDP_per_capita_PPP'] = pd.to_numeric(df_gdp['GDP_per_capita_PPP'], errors='coerce')
+    df_pop['Population'] = pd.to_numeric(df_pop['Population'], errors='coerce')
+
+    # Save output to the requested folder
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Step d) Save and print before sort
+    gdp_head = df_gdp.head()
+    if VERBOSE:
+        print("\n--- GDP Data (Before Sort) ---")
+        print(gdp_head)
+    write_csv_async(gdp_head, f"{output_dir}/gdp_before_sort.csv", index=False)
+
+    pop_head = df_pop.head()
+    if VERBOSE:
+        print("\n--- Population Data (Before Sort) ---")
+        print(pop_head)
+    write_csv_async(pop_head, f"{output_dir}/pop_before_sort.csv", index=False)
+
+    # Sort and save after sort; only the first 5 rows are used, so sort the Country
+    # column alone and take those rows instead of reordering the whole frame
+    gdp_sorted_head = df_gdp.loc[df_gdp["Country"].sort_values().index[:5]]
+    pop_sorted_head = df_pop.loc[df_pop["Country"].sort_values().index[:5]]
+
+    if VERBOSE:
+        print("\n--- GDP Data (After Sort) ---")
+        print(gdp_sorted_head)
+    write_csv_async(gdp_sorted_head, f"{output_dir}/gdp_after_sort.csv", index=False)
+
+    if VERBOSE:
+        print("\n--- Population Data (After Sort) ---")
+        print(pop_sorted_head)
+    write_csv_async(pop_sorted_head, f"{output_dir}/pop_after_sort.csv", index=False)
+
+    # Step e) Describe and print
+    gdp_desc = df_gdp.describe()
+    if VERBOSE:
+        print("\n--- GDP Describe ---")
+        print(gdp_desc)
+    write_csv_async(gdp_desc, f"{output_dir}/gdp_describe.csv")
+
+    pop_desc = df_pop.describe()
+    if VERBOSE:
+        print("\n--- Population Describe ---")
+        print(pop_desc)
+    write_csv_async(pop_desc, f"{output_dir}/pop_describe.csv")
+
+    wait_for_writes()
+
+
+if __name__ == "__main__":
+    # Step a) Load CSV files from parent directory
+    preview(get_gdp().copy(), get_pop().copy())